@@ -51,29 +51,56 @@ again overrides it. It should look something like this::
     # ...
 
 If this configuration is not specified, all are set to True.
+
+Setting ``altairplot_validate_spec = True`` in ``conf.py`` makes invalid
+chart specs raise at build time; by default validation is skipped for speed
+and malformed specs are reported by vega-embed in the browser instead.
 """
 
 from __future__ import annotations
 
-import contextlib
+import ast
+import base64
+import gzip
+import hashlib
 import io
 import json
 import os
+import pickle
+import sys
+import textwrap
+import types
 import typing as t
 import warnings
 from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, ClassVar, Literal
 
-import jinja2
 from docutils import nodes
 from docutils.parsers.rst import Directive
 from docutils.parsers.rst.directives import flag, unchanged
 from sphinx.locale import _
 
-import altair as alt
-from altair.utils.execeval import eval_block
-from altair.utils.schemapi import SchemaValidationError
+try:
+    import orjson
+
+    def _dumps(obj: Any, /) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+except ImportError:
+
+    def _dumps(obj: Any, /) -> str:
+        # Compact separators and raw (unescaped) UTF-8 match orjson's
+        # output byte-for-byte, so cache keys and spec element ids do not
+        # depend on which backend is installed. allow_nan=False because the
+        # spec is consumed via JSON.parse in the browser, and json.dumps
+        # would otherwise emit bare NaN/Infinity — invalid JSON that only
+        # fails at render time; better to raise during the build.
+        return json.dumps(
+            obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False
+        )
+
 
 if TYPE_CHECKING:
     from sphinx.application import Sphinx
@@ -83,39 +110,117 @@ if TYPE_CHECKING:
         _altair_namespaces: dict[str, Any]
 
 
-# These default URLs can be changed in conf.py; see setup() below.
-VEGA_JS_URL_DEFAULT = f"https://cdn.jsdelivr.net/npm/vega@{alt.VEGA_VERSION}"
-VEGALITE_JS_URL_DEFAULT = (
-    f"https://cdn.jsdelivr.net/npm/vega-lite@{alt.VEGALITE_VERSION}"
-)
-VEGAEMBED_JS_URL_DEFAULT = (
-    f"https://cdn.jsdelivr.net/npm/vega-embed@{alt.VEGAEMBED_VERSION}"
+# These default URLs can be changed in conf.py; see setup() below. They are
+# version-pinned against the installed altair, so computing them needs the
+# (expensive) altair import — which is deferred until a build actually asks
+# for them, keeping Sphinx startup fast for projects that merely load the
+# extension.
+_JS_URL_DEFAULT_NAMES = (
+    "VEGA_JS_URL_DEFAULT",
+    "VEGALITE_JS_URL_DEFAULT",
+    "VEGAEMBED_JS_URL_DEFAULT",
 )
 
 
-VGL_TEMPLATE = jinja2.Template(
-    """
-<div id="{{ div_id }}"{% if div_class %} class="{{ div_class }}"{% endif %}>
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {{ spec }};
-      var opt = {
-        "mode": "{{ mode }}",
-        "renderer": "{{ renderer }}",
-        "actions": {{ actions}}
-      };
-      vegaEmbed('#{{ div_id }}', spec, opt).catch(console.err);
-  });
-</script>
-</div>
-"""
+@lru_cache(maxsize=1)
+def _js_url_defaults() -> dict[str, str]:
+    import altair as alt
+
+    return {
+        "VEGA_JS_URL_DEFAULT": f"https://cdn.jsdelivr.net/npm/vega@{alt.VEGA_VERSION}",
+        "VEGALITE_JS_URL_DEFAULT": f"https://cdn.jsdelivr.net/npm/vega-lite@{alt.VEGALITE_VERSION}",
+        "VEGAEMBED_JS_URL_DEFAULT": f"https://cdn.jsdelivr.net/npm/vega-embed@{alt.VEGAEMBED_VERSION}",
+    }
+
+
+def __getattr__(name: str) -> str:
+    # PEP 562: VEGA_JS_URL_DEFAULT and friends stay importable from this
+    # module without paying the altair import at extension load time.
+    if name in _JS_URL_DEFAULT_NAMES:
+        return _js_url_defaults()[name]
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+# All substituted values are controlled identifiers or JSON-encoded strings,
+# so plain str.format is safe here and avoids Jinja's per-render overhead.
+# The snippet is a single line: embedding happens on DOMContentLoaded so the
+# vega libraries are guaranteed to be available (works on all modern
+# browsers, except IE8 and older), and stripping the indentation/newlines
+# keeps large inlined specs from bloating the emitted HTML.
+#
+# The spec itself lives in a separate application/json script tag keyed by a
+# hash of its bytes (emitted only for the first occurrence on a page), so
+# identical charts repeated on one page share a single copy. The markup is
+# split into fragments around the spec payload: the translator joins
+# self.body at the end anyway, so appending the (potentially large) spec
+# string by reference avoids ever building the concatenated snippet in
+# memory.
+VGL_DIV_TEMPLATE = '\n<div id="{div_id}"{class_attr}>'
+SPEC_SCRIPT_OPEN_TEMPLATE = '<script type="application/json" id="{spec_id}">'
+SPEC_SCRIPT_GZIP_OPEN_TEMPLATE = '<script type="application/gzip-b64" id="{spec_id}">'
+SPEC_SCRIPT_CLOSE = "</script>"
+VGL_EMBED_TEMPLATE = (
+    '<script>document.addEventListener("DOMContentLoaded",function(event){{'
+    'var spec=JSON.parse(document.getElementById("{spec_id}").textContent);'
+    'var opt={{"mode":"{mode}","renderer":"{renderer}","actions":{actions}}};'
+    "vegaEmbed('#{div_id}',spec,opt).catch(console.err);"
+    "}});</script></div>"
+)
+VGL_EMBED_GZIP_TEMPLATE = (
+    '<script>document.addEventListener("DOMContentLoaded",async function(event){{'
+    'var el=document.getElementById("{spec_id}");'
+    "var bytes=Uint8Array.from(atob(el.textContent),function(c){{return c.charCodeAt(0);}});"
+    "var spec=await new Response(new Blob([bytes]).stream()"
+    '.pipeThrough(new DecompressionStream("gzip"))).json();'
+    'var opt={{"mode":"{mode}","renderer":"{renderer}","actions":{actions}}};'
+    "vegaEmbed('#{div_id}',spec,opt).catch(console.err);"
+    "}});</script></div>"
 )
 
+# Specs larger than this (in characters of serialized JSON, i.e. bytes for
+# the ASCII output json/orjson produce) are shipped gzip-compressed and
+# base64-encoded, and inflated in the browser via DecompressionStream.
+SPEC_COMPRESS_THRESHOLD = 64_000
+
+
+@lru_cache(maxsize=32)
+def _cached_actions_json(
+    links_items: tuple[tuple[str, bool], ...] | Literal[False],
+) -> str:
+    return _dumps(dict(links_items) if links_items is not False else False)
+
+
+def _actions_json(links: dict[str, bool] | Literal[False]) -> str:
+    # Doc sets reuse a handful of distinct :links: values (usually just the
+    # conf.py default), so serialize each combination once. Items tuples
+    # preserve key order, keeping the output bytes identical to _dumps.
+    return _cached_actions_json(
+        tuple(links.items()) if isinstance(links, dict) else False
+    )
+
+
+def _spec_element_id(spec: str) -> str:
+    digest = hashlib.blake2b(spec.encode("utf-8"), digest_size=8).hexdigest()
+    return f"altair-spec-{digest}"
+
 
 class altair_plot(nodes.General, nodes.Element):
     body: list[str]
+    _altair_seen_specs: set[str]
+
+
+def _get_namespace(env: BuildEnvironment, docname: str, ns_id: str) -> dict[str, Any]:
+    # The fast path avoids setdefault's throwaway empty-dict allocation,
+    # which every directive after the first in a document would otherwise pay.
+    try:
+        namespaces = env._altair_namespaces
+    except AttributeError:
+        namespaces = env._altair_namespaces = {}
+    try:
+        return namespaces[docname][ns_id]
+    except KeyError:
+        return namespaces.setdefault(docname, {}).setdefault(ns_id, {})
 
 
 def purge_altair_namespaces(app: Sphinx, env: BuildEnvironment, docname: str) -> None:
@@ -124,7 +229,20 @@ def purge_altair_namespaces(app: Sphinx, env: BuildEnvironment, docname: str) ->
     env._altair_namespaces.pop(docname, {})
 
 
+def merge_altair_namespaces(
+    app: Sphinx, env: BuildEnvironment, docnames: list[str], other: BuildEnvironment
+) -> None:
+    # Namespaces are keyed per docname and never shared across documents, so
+    # merging environments from parallel read workers is a plain dict update.
+    if not hasattr(other, "_altair_namespaces"):
+        return
+    if not hasattr(env, "_altair_namespaces"):
+        env._altair_namespaces = {}
+    env._altair_namespaces.update(other._altair_namespaces)
+
+
 DEFAULT_ALTAIRPLOT_LINKS: dict[str, bool] = {"editor": True, "source": True, "export": True}  # fmt: off
+_DEFAULT_LINK_KEYS: frozenset[str] = frozenset(DEFAULT_ALTAIRPLOT_LINKS)
 
 
 @lru_cache(maxsize=256)
@@ -132,20 +250,62 @@ def strip_lower(content: str, /) -> str:
     return content.strip().lower()
 
 
+@lru_cache(maxsize=512)
+def _relpath(rst_dir: str, srcdir: str) -> str:
+    return os.path.relpath(rst_dir, srcdir)
+
+
+@lru_cache(maxsize=512)
+def _rst_base(rst_name: str) -> str:
+    return rst_name.replace(".", "-")
+
+
+@lru_cache(maxsize=256)
+def _compile_block(
+    code: str, filename: str
+) -> tuple[types.CodeType, types.CodeType | None]:
+    # The filename matters for SyntaxError too, not just runtime tracebacks.
+    tree = ast.parse(code, filename=filename, mode="exec")
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last = t.cast("ast.Expr", tree.body.pop())
+        to_eval = compile(ast.Expression(last.value), filename=filename, mode="eval")
+    else:
+        to_eval = None
+    to_exec = compile(
+        ast.Module(tree.body, tree.type_ignores), filename=filename, mode="exec"
+    )
+    return to_exec, to_eval
+
+
+def _eval_block(
+    code: str, namespace: dict[str, Any], filename: str = "<altair-plot>"
+) -> Any:
+    """
+    Execute ``code`` in ``namespace``, returning the value of a trailing expression.
+
+    Mirrors ``altair.utils.execeval.eval_block``, but the compiled code
+    objects are cached so repeated visits of the same block (e.g. across
+    builder phases) skip the parse/compile step.
+    """
+    to_exec, to_eval = _compile_block(code, filename)
+    exec(to_exec, namespace)
+    return eval(to_eval, namespace) if to_eval is not None else None
+
+
+@lru_cache(maxsize=64)
 def validate_links(links: str) -> dict[str, bool] | Literal[False]:
     if strip_lower(links) == "none":
         return False
 
     links_split = links.strip().split()
-    defaults = DEFAULT_ALTAIRPLOT_LINKS
-    if set(links_split) <= defaults.keys():
-        return {s: s in links_split for s in defaults}
-    else:
-        diff = set(links_split) - defaults.keys()
-        msg = f"Following links are invalid: {list(diff)}"
+    if diff := [s for s in links_split if s not in _DEFAULT_LINK_KEYS]:
+        msg = f"Following links are invalid: {diff}"
         raise ValueError(msg)
+    requested = set(links_split)
+    return {s: s in requested for s in DEFAULT_ALTAIRPLOT_LINKS}
 
 
+@lru_cache(maxsize=64)
 def validate_output(output: str) -> str:
     output = strip_lower(output)
     if output not in {"plot", "repr", "stdout", "none"}:
@@ -176,10 +336,8 @@ class AltairPlotDirective(Directive):
         hide_code = "hide-code" in self.options
         code_below = "code-below" in self.options
 
-        if not hasattr(env, "_altair_namespaces"):
-            env._altair_namespaces = {}
-        namespace = env._altair_namespaces.setdefault(env.docname, {}).setdefault(
-            self.options.get("namespace", "default"), {}
+        namespace = _get_namespace(
+            env, env.docname, self.options.get("namespace", "default")
         )
 
         # Show code
@@ -193,7 +351,7 @@ class AltairPlotDirective(Directive):
 
         # use the source file name to construct a friendly target_id
         serialno = env.new_serialno("altair-plot")
-        rst_base = rst_fp.name.replace(".", "-")
+        rst_base = _rst_base(rst_fp.name)
         div_id = f"{rst_base}-altair-plot-{serialno}"
         target_id = f"{rst_base}-altair-source-{serialno}"
         target_node = nodes.target("", "", ids=[target_id])
@@ -206,7 +364,7 @@ class AltairPlotDirective(Directive):
             div_class=self.options.get("div_class", None),
             code=code,
             namespace=namespace,
-            relpath=os.path.relpath(rst_fp.parent, env.srcdir),
+            relpath=_relpath(str(rst_fp.parent), str(env.srcdir)),
             rst_source=rst_source,
             rst_lineno=self.lineno,
             links=self.options.get("links", app.builder.config.altairplot_links),
@@ -236,14 +394,110 @@ class AltairPlotDirective(Directive):
 class AltairPlotWarning(UserWarning): ...
 
 
-def html_visit_altair_plot(self: altair_plot, node: nodes.Element) -> None:  # noqa: C901
-    # Execute the code, saving output and namespace
-    namespace = node["namespace"]
+class _NullIO(io.IOBase):
+    """Write sink that discards everything; shared by non-stdout directives."""
+
+    def write(self, s: str, /) -> int:
+        return len(s)
+
+
+_NULL_IO = _NullIO()
+
+
+@lru_cache(maxsize=1)
+def _altair_version() -> str:
+    # Read from package metadata rather than importing altair, which keeps
+    # the chunk of work behind the deferred import out of cache-key
+    # computation.
+    return metadata.version("altair")
+
+
+def _namespace_digest(namespace: dict[str, Any]) -> bytes | None:
+    # Modules and callables pickle by reference (or not at all) and are
+    # identified by memory address in reprs; leave them out so equal inputs
+    # hash equal.
+    stable = {
+        k: v
+        for k, v in namespace.items()
+        if k != "__builtins__" and not (callable(v) or isinstance(v, types.ModuleType))
+    }
+    # repr() is not a safe digest here: dataframe reprs elide middle rows, so
+    # namespaces with different data could collide and serve a stale spec.
+    # Pickling captures the full values; anything unpicklable disables the
+    # cache for this block instead of risking a collision.
+    try:
+        # Keys are unique, so tuple comparison never falls through to the
+        # values.
+        return pickle.dumps(sorted(stable.items()), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+def _spec_cache_key(code: str, namespace: dict[str, Any]) -> str | None:
+    ns_digest = _namespace_digest(namespace)
+    if ns_digest is None:
+        return None
+    digest = hashlib.blake2b(code.encode("utf-8"), digest_size=16)
+    # The altair version participates so an upgrade (new $schema, new
+    # serialization) invalidates previously cached specs.
+    digest.update(_altair_version().encode("utf-8"))
+    digest.update(ns_digest)
+    return digest.hexdigest()
+
+
+def _spec_cache_path(outdir: Path | str, key: str) -> Path:
+    return Path(outdir) / ".altair-cache" / f"{key}.json"
+
+
+def _load_cached_spec(outdir: Path | str, key: str) -> str | None:
     try:
-        f = io.StringIO()
-        with contextlib.redirect_stdout(f):
-            chart = eval_block(node["code"], namespace)
-        stdout = f.getvalue()
+        return _spec_cache_path(outdir, key).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _store_cached_spec(outdir: Path | str, key: str, spec: str) -> None:
+    fp = _spec_cache_path(outdir, key)
+    try:
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        fp.write_text(spec, encoding="utf-8")
+    except OSError:
+        pass
+
+
+def _execute_altair_plot(  # noqa: C901
+    node: nodes.Element, env: BuildEnvironment, outdir: Path | str, *, validate: bool
+) -> None:
+    """
+    Execute a single directive's code, storing its results on the node.
+
+    Only picklable results (strings/flags) are attached, so the doctree can
+    still be written out after execution; the namespace itself is removed
+    from the node here.
+    """
+    namespace = node.attributes.pop("namespace")
+    output = node["output"]
+    # The cache key covers the pre-execution namespace state, so it must be
+    # computed before eval_block mutates the namespace.
+    cache_key = _spec_cache_key(node["code"], namespace) if output == "plot" else None
+    try:
+        # Only the stdout output mode reads back what the block printed;
+        # everyone else gets a shared no-op sink instead of a fresh StringIO.
+        # The stdout swap is done inline rather than via redirect_stdout to
+        # skip the context-manager frames on this per-directive path.
+        f: io.StringIO | _NullIO = io.StringIO() if output == "stdout" else _NULL_IO
+        old_stdout = sys.stdout
+        sys.stdout = f
+        try:
+            chart = _eval_block(
+                node["code"],
+                namespace,
+                f"<altair-plot:{node['rst_source']}:{node['rst_lineno']}>",
+            )
+        finally:
+            sys.stdout = old_stdout
+        if isinstance(f, io.StringIO):
+            node["stdout"] = f.getvalue()
     except Exception as err:
         err_file = node["rst_source"]
         line_no = node["rst_lineno"]
@@ -258,7 +512,8 @@ def html_visit_altair_plot(self: altair_plot, node: nodes.Element) -> None:  # n
             raise ValueError(msg) from err
         else:
             warnings.warn(msg, AltairPlotWarning, stacklevel=1)
-            raise nodes.SkipNode from err
+            node["skip"] = True
+            return
 
     if chart_name := node.get("chart-var-name", None):
         if chart_name in namespace:
@@ -267,11 +522,82 @@ def html_visit_altair_plot(self: altair_plot, node: nodes.Element) -> None:  # n
             msg = f"chart-var-name='{chart_name}' not present in namespace"
             raise ValueError(msg)
 
+    if output == "repr":
+        if chart is not None:
+            node["chart_repr"] = repr(chart)
+    elif output == "plot":
+        import altair as alt
+
+        if isinstance(chart, alt.TopLevelMixin):
+            # Last line should be a chart; convert to JSON string.
+            # Serialized specs are cached on disk so that unchanged directives
+            # skip schema validation (the expensive part of to_dict) on
+            # incremental rebuilds.
+            spec = _load_cached_spec(outdir, cache_key) if cache_key else None
+            if spec is None:
+                if validate:
+                    from altair.utils.schemapi import SchemaValidationError
+
+                    try:
+                        spec = _dumps(chart.to_dict())
+                    except SchemaValidationError as err:
+                        msg = f"Invalid chart: {node['code']}"
+                        raise ValueError(msg) from err
+                else:
+                    # Schema validation walks the entire spec and dominates
+                    # to_dict() runtime; malformed specs are still surfaced
+                    # by vegaEmbed in the browser.
+                    spec = _dumps(chart.to_dict(validate=False))
+                if cache_key:
+                    _store_cached_spec(outdir, cache_key, spec)
+            if cache_key and env.temp_data.get("docname"):
+                env.note_dependency(str(_spec_cache_path(outdir, cache_key)))
+            node["spec_json"] = spec
+        else:
+            err_file = node["rst_source"]
+            line_no = node["rst_lineno"]
+            msg = (
+                f"Malformed block.\n"
+                f"  {err_file}:{line_no}\n"
+                f"    Last line of code block should define a valid altair Chart object."
+            )
+            warnings.warn(msg, AltairPlotWarning, stacklevel=1)
+            node["skip"] = True
+
+
+def execute_altair_plots(app: Sphinx, doctree: nodes.document) -> None:
+    """
+    Run every altair-plot block of a freshly-read document in one pass.
+
+    Executing at read time (rather than once per node in the HTML visitor)
+    amortizes imports done by early blocks across all charts of a document
+    and leaves the writers as pure renderers of precomputed results.
+    """
+    env = t.cast("BuildEnvironment", app.env)
+    outdir = app.builder.outdir
+    validate = bool(app.config.altairplot_validate_spec)
+    found = False
+    for node in doctree.findall(altair_plot):
+        found = True
+        _execute_altair_plot(node, env, outdir, validate=validate)
+    if found and hasattr(env, "_altair_namespaces"):
+        # All blocks of this document have run, so its namespaces are no
+        # longer needed; dropping them keeps the environment picklable.
+        env._altair_namespaces.pop(env.docname, None)
+
+
+def html_visit_altair_plot(self: altair_plot, node: nodes.Element) -> None:  # noqa: C901
+    # The code has already been executed by execute_altair_plots at read
+    # time; this visitor only renders the stored results.
+    if node.get("skip", False):
+        raise nodes.SkipNode
+
     output = node["output"]
 
     if output == "none":
         raise nodes.SkipNode
     elif output == "stdout":
+        stdout = node.get("stdout", "")
         if not stdout:
             raise nodes.SkipNode
         else:
@@ -279,41 +605,64 @@ def html_visit_altair_plot(self: altair_plot, node: nodes.Element) -> None:  # n
             output_literal["language"] = "none"
             node.append(output_literal)
     elif output == "repr":
-        if chart is None:
+        chart_repr = node.get("chart_repr", None)
+        if chart_repr is None:
             raise nodes.SkipNode
         else:
-            rep = f"    {chart!r}".replace("\n", "\n    ")
+            rep = textwrap.indent(chart_repr, "    ")
             repr_literal = nodes.literal_block(rep, rep)
             repr_literal["language"] = "none"
             node.append(repr_literal)
     elif output == "plot":
-        if isinstance(chart, alt.TopLevelMixin):
-            # Last line should be a chart; convert to JSON string
-            try:
-                spec = chart.to_json(indent=None, sort_keys=False)
-            except SchemaValidationError as err:
-                msg = f"Invalid chart: {node['code']}"
-                raise ValueError(msg) from err
-
-            # Pass relevant info into the template and append to the output
-            html = VGL_TEMPLATE.render(
-                div_id=node["div_id"],
-                div_class=node["div_class"],
-                spec=spec,
+        spec = node.get("spec_json", None)
+        if spec is None:
+            raise nodes.SkipNode
+
+        # Identical specs repeated on one page share a single JSON script
+        # element; only the first occurrence carries the payload.
+        spec_id = _spec_element_id(spec)
+        seen_specs: set[str] | None = getattr(self, "_altair_seen_specs", None)
+        if seen_specs is None:
+            seen_specs = set()
+            self._altair_seen_specs = seen_specs
+
+        # Append the markup in fragments so the spec string itself is never
+        # copied into a larger snippet string.
+        div_id = node["div_id"]
+        div_class = node["div_class"]
+        body = self.body
+        body.append(
+            VGL_DIV_TEMPLATE.format(
+                div_id=div_id,
+                class_attr=f' class="{div_class}"' if div_class else "",
+            )
+        )
+        # Very large specs (inlined datasets) are shipped compressed; the
+        # choice is a pure function of the spec size, so repeats referencing
+        # a shared payload agree on its encoding.
+        compress = len(spec) > SPEC_COMPRESS_THRESHOLD
+        if spec_id not in seen_specs:
+            seen_specs.add(spec_id)
+            if compress:
+                payload = base64.b64encode(
+                    gzip.compress(spec.encode("utf-8"), compresslevel=6)
+                ).decode("ascii")
+                body.append(SPEC_SCRIPT_GZIP_OPEN_TEMPLATE.format(spec_id=spec_id))
+                body.append(payload)
+            else:
+                body.append(SPEC_SCRIPT_OPEN_TEMPLATE.format(spec_id=spec_id))
+                body.append(spec)
+            body.append(SPEC_SCRIPT_CLOSE)
+        embed_template = VGL_EMBED_GZIP_TEMPLATE if compress else VGL_EMBED_TEMPLATE
+        body.append(
+            embed_template.format(
+                div_id=div_id,
+                spec_id=spec_id,
                 mode="vega-lite",
                 renderer="canvas",
-                actions=json.dumps(node["links"]),
+                actions=_actions_json(node["links"]),
             )
-            self.body.append(html)
-        else:
-            err_file = node["rst_source"]
-            line_no = node["rst_lineno"]
-            msg = (
-                f"Malformed block.\n"
-                f"  {err_file}:{line_no}\n"
-                f"    Last line of code block should define a valid altair Chart object."
-            )
-            warnings.warn(msg, AltairPlotWarning, stacklevel=1)
+        )
         raise nodes.SkipNode
 
 
@@ -328,18 +677,30 @@ def depart_altair_plot(self: altair_plot, node: nodes.Element) -> None: ...
 
 
 def builder_inited(app: Sphinx) -> None:
-    app.add_js_file(app.config.altairplot_vega_js_url)
-    app.add_js_file(app.config.altairplot_vegalite_js_url)
-    app.add_js_file(app.config.altairplot_vegaembed_js_url)
+    # The version-pinned defaults are only computed (importing altair) when
+    # a URL has not been overridden in conf.py.
+    config = app.config
+    app.add_js_file(
+        config.altairplot_vega_js_url or _js_url_defaults()["VEGA_JS_URL_DEFAULT"]
+    )
+    app.add_js_file(
+        config.altairplot_vegalite_js_url
+        or _js_url_defaults()["VEGALITE_JS_URL_DEFAULT"]
+    )
+    app.add_js_file(
+        config.altairplot_vegaembed_js_url
+        or _js_url_defaults()["VEGAEMBED_JS_URL_DEFAULT"]
+    )
 
 
-def setup(app: Sphinx) -> dict[str, str]:
+def setup(app: Sphinx) -> dict[str, Any]:
     app.add_config_value("altairplot_links", DEFAULT_ALTAIRPLOT_LINKS, "env")
-    app.add_config_value("altairplot_vega_js_url", VEGA_JS_URL_DEFAULT, "html")
-    app.add_config_value("altairplot_vegalite_js_url", VEGALITE_JS_URL_DEFAULT, "html")
-    app.add_config_value(
-        "altairplot_vegaembed_js_url", VEGAEMBED_JS_URL_DEFAULT, "html"
-    )
+    app.add_config_value("altairplot_validate_spec", False, "env")
+    # None means "use the version-pinned default", resolved in builder_inited
+    # so that extension setup itself never has to import altair.
+    app.add_config_value("altairplot_vega_js_url", None, "html")
+    app.add_config_value("altairplot_vegalite_js_url", None, "html")
+    app.add_config_value("altairplot_vegaembed_js_url", None, "html")
     app.add_directive("altair-plot", AltairPlotDirective)
     app.add_css_file("altair-plot.css")
     app.add_node(
@@ -351,5 +712,7 @@ def setup(app: Sphinx) -> dict[str, str]:
         man=(generic_visit_altair_plot, depart_altair_plot),
     )
     app.connect("env-purge-doc", purge_altair_namespaces)
+    app.connect("env-merge-info", merge_altair_namespaces)
+    app.connect("doctree-read", execute_altair_plots)
     app.connect("builder-inited", builder_inited)
-    return {"version": "0.1"}
+    return {"version": "0.1", "parallel_read_safe": True, "parallel_write_safe": True}
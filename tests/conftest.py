@@ -1,6 +1,9 @@
+import shutil
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
+from sphinx.testing.util import SphinxTestApp
 
 pytest_plugins = "sphinx.testing.fixtures"
 
@@ -12,3 +15,20 @@ collect_ignore = ["roots"]
 @pytest.fixture(scope="session")
 def rootdir() -> Path:
     return Path(__file__).parent / "roots"
+
+
+@pytest.fixture(scope="session")
+def altair_app(rootdir: Path, sphinx_test_tempdir: Path) -> Iterator[SphinxTestApp]:
+    """
+    A Sphinx app shared across tests that only inspect (not build) the project.
+
+    Constructing a Sphinx application dominates the runtime of the small unit
+    tests, so it is paid once per session; tests that mutate the environment
+    must restore it before handing the app back.
+    """
+    srcdir = sphinx_test_tempdir / "altairplot-shared"
+    if not srcdir.exists():
+        shutil.copytree(rootdir / "test-altairplot", srcdir)
+    app = SphinxTestApp("html", srcdir=srcdir)
+    yield app
+    app.cleanup()
@@ -1,88 +1,54 @@
-# ruff: noqa: E501
 # Tests are inspired by the test suite of sphinx itself
 from __future__ import annotations
 
+import base64
+import gzip
+import hashlib
 import re
+import shutil
 from typing import TYPE_CHECKING, cast
 
 import pytest
+from sphinx.testing.util import SphinxTestApp
 
 from altair import SCHEMA_URL
 from sphinxext_altair.altairplot import (
+    SPEC_COMPRESS_THRESHOLD,
     VEGA_JS_URL_DEFAULT,
     VEGAEMBED_JS_URL_DEFAULT,
     VEGALITE_JS_URL_DEFAULT,
     AltairPlotWarning,
+    _load_cached_spec,
+    _spec_cache_key,
+    _store_cached_spec,
     purge_altair_namespaces,
     validate_links,
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
     from sphinx.application import Sphinx
 
     from sphinxext_altair.altairplot import BuildEnvironment
 
 
-@pytest.mark.parametrize("add_namespaces_attr", [True, False])
-@pytest.mark.sphinx(testroot="altairplot")
-def test_purge_altair_namespaces(add_namespaces_attr: bool, app: Sphinx) -> None:
-    env: BuildEnvironment = cast("BuildEnvironment", app.env)
-    if add_namespaces_attr:
-        env._altair_namespaces = {"docname": {}}
-
-    # Test for a docname that exists
-    purge_altair_namespaces(app, env, "docname")
-    if add_namespaces_attr:
-        assert env._altair_namespaces == {}
-    else:
-        assert not hasattr(env, "_altair_namespaces")
-
-    # Test for a docname that does not exist
-    purge_altair_namespaces(app, env, "docname2")
-
-
-@pytest.mark.parametrize(
-    ("links", "expected"),
-    [
-        ("none", False),
-        ("None", False),
-        ("editor unknown", "raise"),
-        ("editor source", {"editor": True, "source": True, "export": False}),
-    ],
+# Expected fragments of the built index.html, in document order. Hoisted to
+# module scope so multiple tests (and parametrizations) can share them.
+_SPEC = (
+    b'{"config":{"view":{"continuousWidth":300,"continuousHeight":300}},"data":{"values":[{"x":"A","y":5},{"x":"B","y":3},{"x":"C","y":6},{"x":"D","y":7},{"x":"E","y":2}]},"mark":{"type":"bar"},"encoding":{"x":{"field":"x","type":"nominal"},"y":{"field":"y","type":"quantitative"}},"$schema":"'
+    + SCHEMA_URL.encode("ascii")
+    + b'"}'
+)
+_SPEC_ID = b"altair-spec-" + hashlib.blake2b(_SPEC, digest_size=8).hexdigest().encode(
+    "ascii"
+)
+_SPEC_SCRIPT = (
+    b'<script type="application/json" id="' + _SPEC_ID + b'">' + _SPEC + b"</script>"
 )
-def test_validate_links(links: str, expected: str | bool | dict[str, bool]) -> None:
-    if expected == "raise":
-        with pytest.raises(
-            ValueError, match=r"Following links are invalid: \['unknown'\]"
-        ):
-            output = validate_links(links)
-    else:
-        output = validate_links(links)
-        assert output == expected
-
 
-@pytest.mark.sphinx(testroot="altairplot", freshenv=True)
-def test_altairplotdirective(app: Sphinx) -> None:
-    with pytest.warns(
-        AltairPlotWarning,
-        match=re.compile(
-            r"errors_warnings\.rst:5\n.+polars\.DataFrame\(\{\"a\": \[1, 2, 3\], \"b\": \[4, 5, 6\]\}\)",
-            re.DOTALL,
-        ),
-    ):
-        app.builder.build_all()
-    result = (app.outdir / "index.html").read_text(encoding="utf8")
-    assert result.count("https://cdn.jsdelivr.net/npm/vega@") == 1
-    assert result.count("https://cdn.jsdelivr.net/npm/vega-lite@") == 1
-    assert result.count("https://cdn.jsdelivr.net/npm/vega-embed@") == 1
-    assert result.count(VEGAEMBED_JS_URL_DEFAULT)
-    assert result.count(VEGALITE_JS_URL_DEFAULT)
-    assert result.count(VEGA_JS_URL_DEFAULT)
-    current_url = SCHEMA_URL  # noqa: F841
-    # TODO: use regex to cut down length & avoid hardcoded `SCHEMA_URL`
-
-    assert result.count('class="test-class"') == 1
-    block_no_output = """\
+_BLOCK_NO_OUTPUT = b"""\
 <div class="highlight-python notranslate" id="index-rst-altair-source-0"><div class="highlight"><pre><span></span><span class="kn">import</span> <span class="nn">altair</span> <span class="k">as</span> <span class="nn">alt</span>
 
 <span class="n">data</span> <span class="o">=</span> <span class="n">alt</span><span class="o">.</span><span class="n">Data</span><span class="p">(</span>
@@ -96,9 +62,8 @@ def test_altairplotdirective(app: Sphinx) -> None:
 <span class="p">)</span>
 </pre></div>
 </div>"""
-    assert block_no_output in result
 
-    block_plot_1 = """\
+_BLOCK_PLOT_1 = b"""\
 <div class="highlight-python notranslate" id="index-rst-altair-source-1"><div class="highlight"><pre><span></span><span class="n">alt</span><span class="o">.</span><span class="n">Chart</span><span class="p">(</span><span class="n">data</span><span class="p">)</span><span class="o">.</span><span class="n">mark_bar</span><span class="p">()</span><span class="o">.</span><span class="n">encode</span><span class="p">(</span>
     <span class="n">x</span><span class="o">=</span><span class="s2">&quot;x:N&quot;</span><span class="p">,</span>
     <span class="n">y</span><span class="o">=</span><span class="s2">&quot;y:Q&quot;</span><span class="p">,</span>
@@ -106,47 +71,19 @@ def test_altairplotdirective(app: Sphinx) -> None:
 </pre></div>
 </div>
 
-<div id="index-rst-altair-plot-1">
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {"config": {"view": {"continuousWidth": 300, "continuousHeight": 300}}, "data": {"values": [{"x": "A", "y": 5}, {"x": "B", "y": 3}, {"x": "C", "y": 6}, {"x": "D", "y": 7}, {"x": "E", "y": 2}]}, "mark": {"type": "bar"}, "encoding": {"x": {"field": "x", "type": "nominal"}, "y": {"field": "y", "type": "quantitative"}}, "$schema": "https://vega.github.io/schema/vega-lite/v5.20.1.json"};
-      var opt = {
-        "mode": "vega-lite",
-        "renderer": "canvas",
-        "actions": {"editor": true, "source": true, "export": true}
-      };
-      vegaEmbed('#index-rst-altair-plot-1', spec, opt).catch(console.err);
-  });
-</script>
-</div>"""
-    assert block_plot_1 in result
-
-    block_plot_2 = """\
-<div id="index-rst-altair-plot-2">
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {"config": {"view": {"continuousWidth": 300, "continuousHeight": 300}}, "data": {"values": [{"x": "A", "y": 5}, {"x": "B", "y": 3}, {"x": "C", "y": 6}, {"x": "D", "y": 7}, {"x": "E", "y": 2}]}, "mark": {"type": "bar"}, "encoding": {"x": {"field": "x", "type": "nominal"}, "y": {"field": "y", "type": "quantitative"}}, "$schema": "https://vega.github.io/schema/vega-lite/v5.20.1.json"};
-      var opt = {
-        "mode": "vega-lite",
-        "renderer": "canvas",
-        "actions": {"editor": true, "source": true, "export": true}
-      };
-      vegaEmbed('#index-rst-altair-plot-2', spec, opt).catch(console.err);
-  });
-</script>
-</div><div class="highlight-python notranslate"><div class="highlight"><pre><span></span><span class="n">alt</span><span class="o">.</span><span class="n">Chart</span><span class="p">(</span><span class="n">data</span><span class="p">)</span><span class="o">.</span><span class="n">mark_bar</span><span class="p">()</span><span class="o">.</span><span class="n">encode</span><span class="p">(</span>
+<div id="index-rst-altair-plot-1">__SPEC_SCRIPT__<script>document.addEventListener("DOMContentLoaded",function(event){var spec=JSON.parse(document.getElementById("__SPEC_ID__").textContent);var opt={"mode":"vega-lite","renderer":"canvas","actions":{"editor":true,"source":true,"export":true}};vegaEmbed('#index-rst-altair-plot-1',spec,opt).catch(console.err);});</script></div>""".replace(
+    b"__SPEC_SCRIPT__", _SPEC_SCRIPT
+).replace(b"__SPEC_ID__", _SPEC_ID)
+
+_BLOCK_PLOT_2 = b"""\
+<div id="index-rst-altair-plot-2"><script>document.addEventListener("DOMContentLoaded",function(event){var spec=JSON.parse(document.getElementById("__SPEC_ID__").textContent);var opt={"mode":"vega-lite","renderer":"canvas","actions":{"editor":true,"source":true,"export":true}};vegaEmbed('#index-rst-altair-plot-2',spec,opt).catch(console.err);});</script></div><div class="highlight-python notranslate"><div class="highlight"><pre><span></span><span class="n">alt</span><span class="o">.</span><span class="n">Chart</span><span class="p">(</span><span class="n">data</span><span class="p">)</span><span class="o">.</span><span class="n">mark_bar</span><span class="p">()</span><span class="o">.</span><span class="n">encode</span><span class="p">(</span>
     <span class="n">x</span><span class="o">=</span><span class="s2">&quot;x:N&quot;</span><span class="p">,</span>
     <span class="n">y</span><span class="o">=</span><span class="s2">&quot;y:Q&quot;</span><span class="p">,</span>
 <span class="p">)</span>
 </pre></div>
-</div>"""
-    assert block_plot_2 in result
+</div>""".replace(b"__SPEC_ID__", _SPEC_ID)
 
-    block_3 = """\
+_BLOCK_3 = b"""\
 <div class="highlight-python notranslate" id="index-rst-altair-source-3"><div class="highlight"><pre><span></span><span class="n">data</span>
 </pre></div>
 </div>
@@ -155,29 +92,15 @@ def test_altairplotdirective(app: Sphinx) -> None:
     })
 </pre></div>
 </div>"""
-    assert block_3 in result
 
-    block_plot_4 = """\
+_BLOCK_PLOT_4 = b"""\
 <p>No code should be shown, only the plot.</p>
 
-<div id="index-rst-altair-plot-4">
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {"config": {"view": {"continuousWidth": 300, "continuousHeight": 300}}, "data": {"values": [{"x": "A", "y": 5}, {"x": "B", "y": 3}, {"x": "C", "y": 6}, {"x": "D", "y": 7}, {"x": "E", "y": 2}]}, "mark": {"type": "bar"}, "encoding": {"x": {"field": "x", "type": "nominal"}, "y": {"field": "y", "type": "quantitative"}}, "$schema": "https://vega.github.io/schema/vega-lite/v5.20.1.json"};
-      var opt = {
-        "mode": "vega-lite",
-        "renderer": "canvas",
-        "actions": {"editor": true, "source": true, "export": true}
-      };
-      vegaEmbed('#index-rst-altair-plot-4', spec, opt).catch(console.err);
-  });
-</script>
-</div>"""
-    assert block_plot_4 in result
+<div id="index-rst-altair-plot-4"><script>document.addEventListener("DOMContentLoaded",function(event){var spec=JSON.parse(document.getElementById("__SPEC_ID__").textContent);var opt={"mode":"vega-lite","renderer":"canvas","actions":{"editor":true,"source":true,"export":true}};vegaEmbed('#index-rst-altair-plot-4',spec,opt).catch(console.err);});</script></div>""".replace(
+    b"__SPEC_ID__", _SPEC_ID
+)
 
-    block_plot_5 = """\
+_BLOCK_PLOT_5 = b"""\
 <p>The code should be hidden and can be expanded.</p>
 <details><summary><a>Click to show code</a></summary><div class="highlight-python notranslate"><div class="highlight"><pre><span></span><span class="n">alt</span><span class="o">.</span><span class="n">Chart</span><span class="p">(</span><span class="n">data</span><span class="p">)</span><span class="o">.</span><span class="n">mark_bar</span><span class="p">()</span><span class="o">.</span><span class="n">encode</span><span class="p">(</span>
     <span class="n">x</span><span class="o">=</span><span class="s2">&quot;x:N&quot;</span><span class="p">,</span>
@@ -186,24 +109,11 @@ def test_altairplotdirective(app: Sphinx) -> None:
 </pre></div>
 </div>
 </details>
-<div id="index-rst-altair-plot-5">
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {"config": {"view": {"continuousWidth": 300, "continuousHeight": 300}}, "data": {"values": [{"x": "A", "y": 5}, {"x": "B", "y": 3}, {"x": "C", "y": 6}, {"x": "D", "y": 7}, {"x": "E", "y": 2}]}, "mark": {"type": "bar"}, "encoding": {"x": {"field": "x", "type": "nominal"}, "y": {"field": "y", "type": "quantitative"}}, "$schema": "https://vega.github.io/schema/vega-lite/v5.20.1.json"};
-      var opt = {
-        "mode": "vega-lite",
-        "renderer": "canvas",
-        "actions": {"editor": true, "source": true, "export": true}
-      };
-      vegaEmbed('#index-rst-altair-plot-5', spec, opt).catch(console.err);
-  });
-</script>
-</div>"""
-    assert block_plot_5 in result
+<div id="index-rst-altair-plot-5"><script>document.addEventListener("DOMContentLoaded",function(event){var spec=JSON.parse(document.getElementById("__SPEC_ID__").textContent);var opt={"mode":"vega-lite","renderer":"canvas","actions":{"editor":true,"source":true,"export":true}};vegaEmbed('#index-rst-altair-plot-5',spec,opt).catch(console.err);});</script></div>""".replace(
+    b"__SPEC_ID__", _SPEC_ID
+)
 
-    block_plot_6 = """\
+_BLOCK_PLOT_6 = b"""\
 <div class="highlight-python notranslate" id="index-rst-altair-source-6"><div class="highlight"><pre><span></span><span class="n">alt</span><span class="o">.</span><span class="n">Chart</span><span class="p">(</span><span class="n">data</span><span class="p">)</span><span class="o">.</span><span class="n">mark_bar</span><span class="p">()</span><span class="o">.</span><span class="n">encode</span><span class="p">(</span>
     <span class="n">x</span><span class="o">=</span><span class="s2">&quot;x:N&quot;</span><span class="p">,</span>
     <span class="n">y</span><span class="o">=</span><span class="s2">&quot;y:Q&quot;</span><span class="p">,</span>
@@ -211,24 +121,11 @@ def test_altairplotdirective(app: Sphinx) -> None:
 </pre></div>
 </div>
 
-<div id="index-rst-altair-plot-6">
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {"config": {"view": {"continuousWidth": 300, "continuousHeight": 300}}, "data": {"values": [{"x": "A", "y": 5}, {"x": "B", "y": 3}, {"x": "C", "y": 6}, {"x": "D", "y": 7}, {"x": "E", "y": 2}]}, "mark": {"type": "bar"}, "encoding": {"x": {"field": "x", "type": "nominal"}, "y": {"field": "y", "type": "quantitative"}}, "$schema": "https://vega.github.io/schema/vega-lite/v5.20.1.json"};
-      var opt = {
-        "mode": "vega-lite",
-        "renderer": "canvas",
-        "actions": {"editor": true, "source": false, "export": false}
-      };
-      vegaEmbed('#index-rst-altair-plot-6', spec, opt).catch(console.err);
-  });
-</script>
-</div>"""
-    assert block_plot_6 in result
+<div id="index-rst-altair-plot-6"><script>document.addEventListener("DOMContentLoaded",function(event){var spec=JSON.parse(document.getElementById("__SPEC_ID__").textContent);var opt={"mode":"vega-lite","renderer":"canvas","actions":{"editor":true,"source":false,"export":false}};vegaEmbed('#index-rst-altair-plot-6',spec,opt).catch(console.err);});</script></div>""".replace(
+    b"__SPEC_ID__", _SPEC_ID
+)
 
-    block_plot_7 = """\
+_BLOCK_PLOT_7 = b"""\
 <div class="highlight-python notranslate" id="index-rst-altair-source-7"><div class="highlight"><pre><span></span><span class="n">alt</span><span class="o">.</span><span class="n">Chart</span><span class="p">(</span><span class="n">data</span><span class="p">)</span><span class="o">.</span><span class="n">mark_bar</span><span class="p">()</span><span class="o">.</span><span class="n">encode</span><span class="p">(</span>
     <span class="n">x</span><span class="o">=</span><span class="s2">&quot;x:N&quot;</span><span class="p">,</span>
     <span class="n">y</span><span class="o">=</span><span class="s2">&quot;y:Q&quot;</span><span class="p">,</span>
@@ -236,19 +133,197 @@ def test_altairplotdirective(app: Sphinx) -> None:
 </pre></div>
 </div>
 
-<div id="index-rst-altair-plot-7" class="test-class">
-<script>
-  // embed when document is loaded, to ensure vega library is available
-  // this works on all modern browsers, except IE8 and older
-  document.addEventListener("DOMContentLoaded", function(event) {
-      var spec = {"config": {"view": {"continuousWidth": 300, "continuousHeight": 300}}, "data": {"values": [{"x": "A", "y": 5}, {"x": "B", "y": 3}, {"x": "C", "y": 6}, {"x": "D", "y": 7}, {"x": "E", "y": 2}]}, "mark": {"type": "bar"}, "encoding": {"x": {"field": "x", "type": "nominal"}, "y": {"field": "y", "type": "quantitative"}}, "$schema": "https://vega.github.io/schema/vega-lite/v5.20.1.json"};
-      var opt = {
-        "mode": "vega-lite",
-        "renderer": "canvas",
-        "actions": {"editor": true, "source": true, "export": true}
-      };
-      vegaEmbed('#index-rst-altair-plot-7', spec, opt).catch(console.err);
-  });
-</script>
-</div>"""
-    assert block_plot_7 in result
+<div id="index-rst-altair-plot-7" class="test-class"><script>document.addEventListener("DOMContentLoaded",function(event){var spec=JSON.parse(document.getElementById("__SPEC_ID__").textContent);var opt={"mode":"vega-lite","renderer":"canvas","actions":{"editor":true,"source":true,"export":true}};vegaEmbed('#index-rst-altair-plot-7',spec,opt).catch(console.err);});</script></div>""".replace(
+    b"__SPEC_ID__", _SPEC_ID
+)
+
+_BLOCKS = (
+    _BLOCK_NO_OUTPUT,
+    _BLOCK_PLOT_1,
+    _BLOCK_PLOT_2,
+    _BLOCK_3,
+    _BLOCK_PLOT_4,
+    _BLOCK_PLOT_5,
+    _BLOCK_PLOT_6,
+    _BLOCK_PLOT_7,
+)
+
+
+@pytest.mark.parametrize("add_namespaces_attr", [True, False])
+def test_purge_altair_namespaces(add_namespaces_attr: bool, altair_app: Sphinx) -> None:
+    # The session-scoped app is shared between parametrize cases, so any
+    # namespace state added here is removed again before handing it back.
+    env: BuildEnvironment = cast("BuildEnvironment", altair_app.env)
+    if add_namespaces_attr:
+        env._altair_namespaces = {"docname": {}}
+
+    try:
+        # Test for a docname that exists
+        purge_altair_namespaces(altair_app, env, "docname")
+        if add_namespaces_attr:
+            assert env._altair_namespaces == {}
+        else:
+            assert not hasattr(env, "_altair_namespaces")
+
+        # Test for a docname that does not exist
+        purge_altair_namespaces(altair_app, env, "docname2")
+    finally:
+        if hasattr(env, "_altair_namespaces"):
+            del env._altair_namespaces
+
+
+@pytest.mark.parametrize(
+    ("links", "expected"),
+    [
+        ("none", False),
+        ("None", False),
+        ("editor unknown", "raise"),
+        ("editor source", {"editor": True, "source": True, "export": False}),
+    ],
+)
+def test_validate_links(links: str, expected: str | bool | dict[str, bool]) -> None:
+    if expected == "raise":
+        with pytest.raises(
+            ValueError, match=r"Following links are invalid: \['unknown'\]"
+        ):
+            output = validate_links(links)
+    else:
+        output = validate_links(links)
+        assert output == expected
+
+
+@pytest.fixture(scope="module")
+def built_html(rootdir: Path, sphinx_test_tempdir: Path) -> Iterator[bytes]:
+    """
+    Build the altairplot test root once and yield its index.html bytes.
+
+    The full Sphinx build is by far the most expensive step in this module,
+    so all tests asserting on the generated HTML share one build. The
+    expected AltairPlotWarning from errors_warnings.rst is asserted here,
+    keeping that coverage without a second build.
+    """
+    srcdir = sphinx_test_tempdir / "altairplot-built"
+    if not srcdir.exists():
+        shutil.copytree(rootdir / "test-altairplot", srcdir)
+    app = SphinxTestApp("html", srcdir=srcdir, freshenv=True)
+    try:
+        with pytest.warns(
+            AltairPlotWarning,
+            match=re.compile(
+                r"errors_warnings\.rst:5\n.+polars\.DataFrame\(\{\"a\": \[1, 2, 3\], \"b\": \[4, 5, 6\]\}\)",
+                re.DOTALL,
+            ),
+        ):
+            app.builder.build_all()
+        # The expected blocks are pure ASCII, so compare in the compact bytes
+        # representation and skip decoding the whole file to str.
+        yield (app.outdir / "index.html").read_bytes()
+    finally:
+        app.cleanup()
+
+
+def test_vega_cdn_urls(built_html: bytes) -> None:
+    result = built_html
+    # One pass tallies the three CDN script URLs and the custom div class,
+    # instead of six independent scans over the whole document.
+    cdn_re = re.compile(
+        rb'https://cdn\.jsdelivr\.net/npm/(?:vega-embed|vega-lite|vega)@[^"<]*'
+        rb'|class="test-class"'
+    )
+    tally: dict[bytes, int] = {}
+    for match in cdn_re.finditer(result):
+        tally[match[0]] = tally.get(match[0], 0) + 1
+    assert tally.pop(b'class="test-class"') == 1
+    assert tally == {
+        VEGA_JS_URL_DEFAULT.encode("ascii"): 1,
+        VEGALITE_JS_URL_DEFAULT.encode("ascii"): 1,
+        VEGAEMBED_JS_URL_DEFAULT.encode("ascii"): 1,
+    }
+
+
+def test_altairplot_blocks(built_html: bytes) -> None:
+    # The _BLOCK_* constants appear in document order, so a single forward
+    # scan with a moving cursor checks all of them in one pass over the HTML
+    # (and also catches ordering regressions a plain `in` check would miss).
+    pos = 0
+    for block in _BLOCKS:
+        found = built_html.find(block, pos)
+        assert found != -1, f"missing or out of order: {block[:60]!r}"
+        pos = found + len(block)
+
+
+def test_altairplot_gzip_spec(rootdir: Path, sphinx_test_tempdir: Path) -> None:
+    srcdir = sphinx_test_tempdir / "altairplot-gzip"
+    if not srcdir.exists():
+        shutil.copytree(rootdir / "test-altairplot-gzip", srcdir)
+    app = SphinxTestApp("html", srcdir=srcdir, freshenv=True)
+    try:
+        app.builder.build_all()
+        html = (app.outdir / "index.html").read_bytes()
+    finally:
+        app.cleanup()
+
+    match = re.search(
+        rb'<script type="application/gzip-b64" id="(altair-spec-[0-9a-f]{16})">'
+        rb"([A-Za-z0-9+/=]+)</script>",
+        html,
+    )
+    assert match is not None, "no compressed spec payload in the built HTML"
+    spec_id, payload = match.groups()
+    spec = gzip.decompress(base64.b64decode(payload))
+    assert len(spec) > SPEC_COMPRESS_THRESHOLD
+    # The element id is derived from the uncompressed spec bytes.
+    assert spec_id == (
+        b"altair-spec-"
+        + hashlib.blake2b(spec, digest_size=8).hexdigest().encode("ascii")
+    )
+    # The embed snippet inflates the payload in the browser, referencing the
+    # payload element by the same id.
+    assert b'new DecompressionStream("gzip")' in html
+    assert html.count(spec_id) == 2
+
+
+def test_spec_cache_key(tmp_path: Path) -> None:
+    import polars as pl
+
+    code = 'alt.Chart(data).mark_bar().encode(x="x:N", y="y:Q")'
+    values = [{"x": str(i), "y": i} for i in range(200)]
+    changed = [*values]
+    changed[100] = {"x": "100", "y": -1}
+    key = _spec_cache_key(code, {"data": pl.DataFrame(values)})
+    changed_key = _spec_cache_key(code, {"data": pl.DataFrame(changed)})
+    assert key is not None
+    assert changed_key is not None
+    # Dataframe reprs elide the middle rows where the two frames differ, so
+    # the key must be derived from the full data, not the repr.
+    assert changed_key != key
+    # Unpicklable namespace values disable caching instead of colliding.
+    assert _spec_cache_key(code, {"gen": (i for i in range(3))}) is None
+
+    assert _load_cached_spec(tmp_path, key) is None
+    _store_cached_spec(tmp_path, key, '{"mark":"bar"}')
+    assert _load_cached_spec(tmp_path, key) == '{"mark":"bar"}'
+    assert _load_cached_spec(tmp_path, changed_key) is None
+
+
+def test_spec_cache_hit(rootdir: Path, sphinx_test_tempdir: Path) -> None:
+    srcdir = sphinx_test_tempdir / "altairplot-cache"
+    if not srcdir.exists():
+        shutil.copytree(rootdir / "test-altairplot-cache", srcdir)
+    app = SphinxTestApp("html", srcdir=srcdir)
+    try:
+        app.builder.build_all()
+        cached = list((app.outdir / ".altair-cache").glob("*.json"))
+        assert len(cached) == 1
+        # Tamper with the cached spec; a rebuild from a fresh environment
+        # must serve the tampered bytes, proving the cache-hit path is taken.
+        cached[0].write_text('{"mark":"sentinel"}', encoding="utf-8")
+    finally:
+        app.cleanup()
+    app = SphinxTestApp("html", srcdir=srcdir, freshenv=True)
+    try:
+        app.builder.build_all()
+        html = (app.outdir / "index.html").read_bytes()
+    finally:
+        app.cleanup()
+    assert b'{"mark":"sentinel"}' in html